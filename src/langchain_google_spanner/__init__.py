@@ -19,6 +19,7 @@ from langchain_google_spanner.vector_store import (
     SecondaryIndex,
     SpannerVectorStore,
     TableColumn,
+    VectorSearchIndex,
 )
 
 from .loader import SpannerDocumentSaver, SpannerLoader
@@ -34,4 +35,5 @@ __all__ = [
     "SecondaryIndex",
     "QueryParameters",
     "DistanceStrategy",
+    "VectorSearchIndex",
 ]
@@ -15,15 +15,31 @@
 from __future__ import annotations
 
 import datetime
+import itertools
 import logging
+import uuid
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sized,
+    Tuple,
+    Type,
+    Union,
+)
 
 import numpy as np
+from google.api_core.exceptions import NotFound
 from google.cloud import spanner  # type: ignore
 from google.cloud.spanner_admin_database_v1.types import DatabaseDialect
-from google.cloud.spanner_v1 import JsonObject, param_types
+from google.cloud.spanner_v1 import JsonObject, KeyRange, KeySet, param_types
+from google.rpc import code_pb2  # type: ignore
 from langchain_community.vectorstores.utils import maximal_marginal_relevance
 from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
@@ -41,10 +57,79 @@ ADDITIONAL_METADATA_COLUMN_NAME = "metadata"
 USER_AGENT_VECTOR_STORE = "langchain-google-spanner-python:vector_store/" + __version__
 
 KNN_DISTANCE_SEARCH_QUERY_ALIAS = "distance"
+QUERY_INDEX_ALIAS = "query_index"
+
+VECTOR_SEARCH_REQUEST_TAG = "langchain_vector_search"
+
+DELETE_BATCH_SIZE = 20000
+
+_DIALECT_CACHE: Dict[Tuple[str, str, str], DatabaseDialect] = {}
+
+# Column types whose values may be NumPy scalars, converted on insert.
+_NUMERIC_COLUMN_TYPES = (
+    "int64",
+    "float64",
+    "float32",
+    "numeric",
+    "bool",
+    "bigint",
+    "double precision",
+    "real",
+    "boolean",
+)
+
+_PLAIN_VALUE_TYPES = frozenset((str, int, float, bool, type(None)))
 
 from dataclasses import dataclass
 
 
+def _normalize_embeddings(embeddings: List[List[float]]) -> List[List[float]]:
+    """
+    Scale the embeddings to unit length, leaving zero vectors untouched.
+    """
+    matrix = np.asarray(embeddings, dtype=np.float64)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).tolist()
+
+
+def _from_numpy(value: Any) -> Any:
+    """
+    Convert NumPy values, e.g. coming from Pandas, nested in an array or JSON value to
+    the equivalent Python values. Containers only holding plain Python values are
+    returned as they are, so they aren't walked or copied.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, dict):
+        if set(map(type, value.values())) <= _PLAIN_VALUE_TYPES:
+            return value
+        return {key: _from_numpy(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if set(map(type, value)) <= _PLAIN_VALUE_TYPES:
+            return value
+        return [_from_numpy(item) for item in value]
+    return value
+
+
+def _normalized_embeddings_constraint_name(
+    table_name: str, embedding_column: str
+) -> str:
+    """
+    Get the name of the check constraint marking a table whose embeddings are normalized.
+    """
+    return "{}_{}_normalized".format(table_name, embedding_column)
+
+
+def _escape_format_braces(value: str) -> str:
+    """
+    Escape the braces of a value embedded in a str.format template.
+    """
+    return value.replace("{", "{{").replace("}", "}}")
+
+
 def client_with_user_agent(
     client: Optional[spanner.Client], user_agent: str
 ) -> spanner.Client:
@@ -58,7 +143,7 @@ def client_with_user_agent(
     return client
 
 
-@dataclass
+@dataclass(frozen=True)
 class TableColumn:
     """
     Represents column configuration, to be used as part of create DDL statement for table creation.
@@ -100,10 +185,47 @@ class SecondaryIndex:
 class DistanceStrategy(Enum):
     """
     Enum for distance calculation strategies.
+
+    DOT_PRODUCT ranks by cosine distance computed as ``1 - DOT_PRODUCT``, which skips
+    the per-row norm computation. It requires a table created with
+    ``distance_strategy=DistanceStrategy.DOT_PRODUCT``, whose check constraint only
+    accepts unit length embeddings. Embeddings are normalized on insert into such a
+    table, whatever the distance strategy of the store, and on query.
     """
 
     COSINE = 1
     EUCLIDEIAN = 2
+    DOT_PRODUCT = 3
+
+
+@dataclass
+class VectorSearchIndex:
+    """
+    Represents a vector index used for approximate nearest neighbor search.
+
+    Attributes:
+        index_name (str): The name of the vector index.
+        num_leaves (int): The number of leaves of the index tree.
+        tree_depth (int): The depth of the index tree, either 2 or 3. Defaults to 2.
+        num_branches (Optional[int]): The number of branches of the index tree, only used when tree_depth is 3.
+        distance_strategy (DistanceStrategy): The distance calculation strategy of the index. Defaults to DistanceStrategy.EUCLIDEAN.
+    """
+
+    index_name: str
+    num_leaves: int
+    tree_depth: int = 2
+    num_branches: Optional[int] = None
+    distance_strategy: DistanceStrategy = DistanceStrategy.EUCLIDEIAN
+
+    def __post_init__(self):
+        if self.index_name is None:
+            raise ValueError("Index Name can't be None")
+
+        if self.num_leaves is None:
+            raise ValueError("Number of leaves can't be None")
+
+        if self.tree_depth not in (2, 3):
+            raise ValueError("Tree depth must be either 2 or 3")
 
 
 class DialectSemantics(ABC):
@@ -126,12 +248,45 @@ class DialectSemantics(ABC):
             "getDistanceFunction method must be implemented by subclass."
         )
 
+    @abstractmethod
+    def getApproximateDistanceFunction(
+        self, distance_strategy=DistanceStrategy.EUCLIDEIAN
+    ) -> str:
+        """
+        Abstract method to get the approximate distance function, backed by a vector index,
+        based on the provided distance strategy.
+
+        Parameters:
+        - distance_strategy (DistanceStrategy): The distance calculation strategy. Defaults to DistanceStrategy.EUCLIDEAN.
+
+        Returns:
+        - str: The name of the approximate distance function.
+        """
+        raise NotImplementedError(
+            "getApproximateDistanceFunction method must be implemented by subclass."
+        )
+
     @abstractmethod
     def getDeleteDocumentsParameters(self, columns) -> Tuple[str, Any]:
         raise NotImplementedError(
             "getDeleteDocumentsParameters method must be implemented by subclass."
         )
 
+    @abstractmethod
+    def getDeleteIdsParameters(self, id_column) -> Tuple[str, str]:
+        """
+        Abstract method to get the where clause matching a list of ids bound as a single array parameter.
+
+        Parameters:
+        - id_column (str): The name of the row ID column.
+
+        Returns:
+        - Tuple[str, str]: The where clause and the name of the array parameter.
+        """
+        raise NotImplementedError(
+            "getDeleteIdsParameters method must be implemented by subclass."
+        )
+
     @abstractmethod
     def getDeleteDocumentsValueParameters(self, columns, values) -> Dict[str, Any]:
         raise NotImplementedError(
@@ -147,9 +302,21 @@ class GoogleSqlSemnatics(DialectSemantics):
     def getDistanceFunction(self, distance_strategy=DistanceStrategy.EUCLIDEIAN) -> str:
         if distance_strategy == DistanceStrategy.COSINE:
             return "COSINE_DISTANCE"
+        elif distance_strategy == DistanceStrategy.DOT_PRODUCT:
+            return "DOT_PRODUCT"
 
         return "EUCLIDEAN_DISTANCE"
 
+    def getApproximateDistanceFunction(
+        self, distance_strategy=DistanceStrategy.EUCLIDEIAN
+    ) -> str:
+        if distance_strategy == DistanceStrategy.COSINE:
+            return "APPROX_COSINE_DISTANCE"
+        elif distance_strategy == DistanceStrategy.DOT_PRODUCT:
+            return "APPROX_DOT_PRODUCT"
+
+        return "APPROX_EUCLIDEAN_DISTANCE"
+
     def getDeleteDocumentsParameters(self, columns) -> Tuple[str, Any]:
         where_clause_condition = " AND ".join(
             ["{} = @{}".format(column, column) for column in columns]
@@ -162,6 +329,9 @@ class GoogleSqlSemnatics(DialectSemantics):
     def getDeleteDocumentsValueParameters(self, columns, values) -> Dict[str, Any]:
         return dict(zip(columns, values))
 
+    def getDeleteIdsParameters(self, id_column) -> Tuple[str, str]:
+        return "{} IN UNNEST(@ids)".format(id_column), "ids"
+
 
 class PGSqlSemnatics(DialectSemantics):
     """
@@ -171,8 +341,17 @@ class PGSqlSemnatics(DialectSemantics):
     def getDistanceFunction(self, distance_strategy=DistanceStrategy.EUCLIDEIAN) -> str:
         if distance_strategy == DistanceStrategy.COSINE:
             return "spanner.cosine_distance"
+        elif distance_strategy == DistanceStrategy.DOT_PRODUCT:
+            return "spanner.dot_product"
         return "spanner.euclidean_distance"
 
+    def getApproximateDistanceFunction(
+        self, distance_strategy=DistanceStrategy.EUCLIDEIAN
+    ) -> str:
+        raise ValueError(
+            "Approximate nearest neighbor search is only supported for GoogleSQL dialect."
+        )
+
     def getDeleteDocumentsParameters(self, columns) -> Tuple[str, Any]:
         where_clause_condition = " AND ".join(
             [
@@ -198,6 +377,9 @@ class PGSqlSemnatics(DialectSemantics):
         ]
         return dict(zip(value_placeholder_list, values))
 
+    def getDeleteIdsParameters(self, id_column) -> Tuple[str, str]:
+        return "{} = ANY($1)".format(id_column), "p1"
+
 
 class QueryParameters:
     """
@@ -210,6 +392,7 @@ class QueryParameters:
         """
 
         EXACT_NEAREST_NEIGHBOR = 1
+        APPROXIMATE_NEAREST_NEIGHBOR = 2
 
     def __init__(
         self,
@@ -219,6 +402,10 @@ class QueryParameters:
         min_read_timestamp: Optional[datetime.datetime] = None,
         max_staleness: Optional[datetime.timedelta] = None,
         exact_staleness: Optional[datetime.timedelta] = None,
+        vector_index_name: Optional[str] = None,
+        num_leaves_to_search: Optional[int] = None,
+        request_tag: str = VECTOR_SEARCH_REQUEST_TAG,
+        over_fetch: int = 1,
     ):
         """
         Initialize query parameters.
@@ -227,9 +414,34 @@ class QueryParameters:
         - algorithm (NearestNeighborsAlgorithm): The nearest neighbors search algorithm. Defaults to NearestNeighborsAlgorithm.BRUTE_FORCE.
         - distance_strategy (DistanceStrategy): The distance calculation strategy. Defaults to DistanceStrategy.EUCLIDEAN.
         - staleness (int): The staleness value. Defaults to 0.
+        - vector_index_name (Optional[str]): The vector index to search, required for APPROXIMATE_NEAREST_NEIGHBOR. Defaults to None.
+        - num_leaves_to_search (Optional[int]): The number of index leaves to search, required for APPROXIMATE_NEAREST_NEIGHBOR. Defaults to None.
+        - request_tag (str): The request tag of the search queries, used to group them in the Spanner query statistics. Defaults to VECTOR_SEARCH_REQUEST_TAG.
+        - over_fetch (int): For APPROXIMATE_NEAREST_NEIGHBOR, fetch k * over_fetch candidates and re-rank them by exact distance on the client to recover recall. Defaults to 1, which keeps the ranking of the index.
         """
         self.algorithm = algorithm
         self.distance_strategy = distance_strategy
+        self.vector_index_name = vector_index_name
+        self.num_leaves_to_search = num_leaves_to_search
+        self.request_options = {"request_tag": request_tag}
+        self.over_fetch = over_fetch
+
+        if over_fetch < 1:
+            raise ValueError("over_fetch must be greater than or equal to 1.")
+
+        if (
+            algorithm
+            == QueryParameters.NearestNeighborsAlgorithm.APPROXIMATE_NEAREST_NEIGHBOR
+        ):
+            if vector_index_name is None:
+                raise ValueError(
+                    "vector_index_name is mandatory for approximate nearest neighbor search."
+                )
+
+            if num_leaves_to_search is None:
+                raise ValueError(
+                    "num_leaves_to_search is mandatory for approximate nearest neighbor search."
+                )
 
         key: Optional[str]
         value: Any
@@ -257,13 +469,13 @@ class QueryParameters:
 class SpannerVectorStore(VectorStore):
     GSQL_TYPES = {
         CONTENT_COLUMN_NAME: ["STRING"],
-        EMBEDDING_COLUMN_NAME: ["ARRAY<FLOAT64>"],
+        EMBEDDING_COLUMN_NAME: ["ARRAY<FLOAT64>", "ARRAY<FLOAT32>"],
         "metadata_json_column": ["JSON"],
     }
 
     PGSQL_TYPES = {
         CONTENT_COLUMN_NAME: ["character varying"],
-        EMBEDDING_COLUMN_NAME: ["double precision[]"],
+        EMBEDDING_COLUMN_NAME: ["double precision[]", "real[]"],
         "metadata_json_column": ["jsonb"],
     }
 
@@ -284,6 +496,9 @@ class SpannerVectorStore(VectorStore):
         primary_key: Optional[str] = None,
         vector_size: Optional[int] = None,
         secondary_indexes: Optional[List[SecondaryIndex]] = None,
+        vector_search_index: Optional[VectorSearchIndex] = None,
+        interleave_in_parent: Optional[str] = None,
+        distance_strategy: DistanceStrategy = DistanceStrategy.EUCLIDEIAN,
     ) -> bool:
         """
         Initialize the vector store new table in Google Cloud Spanner.
@@ -292,12 +507,16 @@ class SpannerVectorStore(VectorStore):
         - instance_id (str): The ID of the Spanner instance.
         - database_id (str): The ID of the Spanner database.
         - table_name (str): The name of the table to initialize.
-        - client (Client): The Spanner client. Defaults to Client(project="span-cloud-testing").
+        - client (Client): The Spanner client. Defaults to Client().
         - id_column (str): The name of the row ID column. Defaults to ID_COLUMN_NAME.
         - content_column (str): The name of the content column. Defaults to CONTENT_COLUMN_NAME.
         - embedding_column (str): The name of the embedding column. Defaults to EMBEDDING_COLUMN_NAME.
         - metadata_columns (Optional[List[Tuple]]): List of tuples containing metadata column information. Defaults to None.
-        - vector_size (Optional[int]): The size of the vector. Defaults to None.
+        - vector_size (Optional[int]): The size of the vector, used as the vector length of the embedding column. Defaults to None.
+        - secondary_indexes (Optional[List[SecondaryIndex]]): List of secondary indexes to create. Defaults to None.
+        - vector_search_index (Optional[VectorSearchIndex]): Vector index to create for approximate nearest neighbor search. Defaults to None.
+        - interleave_in_parent (Optional[str]): Name of an existing parent table to interleave the new table in, so rows are stored with their parent row. The primary key must start with the primary key columns of the parent. Defaults to None.
+        - distance_strategy (DistanceStrategy): The distance strategy the table is searched with. DistanceStrategy.DOT_PRODUCT adds a check constraint only accepting unit length embeddings, which DOT_PRODUCT stores require. Defaults to DistanceStrategy.EUCLIDEAN.
         """
 
         client = client_with_user_agent(client, USER_AGENT_VECTOR_STORE)
@@ -322,15 +541,76 @@ class SpannerVectorStore(VectorStore):
             metadata_columns,
             primary_key,
             secondary_indexes,
+            vector_size,
+            interleave_in_parent,
+            distance_strategy == DistanceStrategy.DOT_PRODUCT,
         )
 
+        logger.debug("Creating vector store table, ddl=%s", ddl)
         operation = database.update_ddl(ddl)
-
-        print("Waiting for operation to complete...")
         operation.result(100000)
 
+        if vector_search_index is not None:
+            vector_index_ddl = SpannerVectorStore._generate_vector_index_sql(
+                database.database_dialect,
+                table_name,
+                embedding_column,
+                vector_search_index,
+            )
+
+            logger.debug("Creating vector index, ddl=%s", vector_index_ddl)
+            operation = database.update_ddl([vector_index_ddl])
+            operation.result(100000)
+
         return True
 
+    @staticmethod
+    def _generate_vector_index_sql(
+        dialect,
+        table_name,
+        embedding_column,
+        vector_search_index: VectorSearchIndex,
+    ) -> str:
+        """
+        Generate SQL for creating the vector index on the embedding column.
+
+        Parameters:
+        - dialect: The database dialect.
+        - table_name: The name of the table.
+        - embedding_column: The name of the embedding column.
+        - vector_search_index: The vector index configuration.
+
+        Returns:
+        - str: The generated SQL.
+        """
+        if dialect == DatabaseDialect.POSTGRESQL:
+            raise Exception("Vector index is not supported for PostgreSQL dialect.")
+
+        if isinstance(embedding_column, TableColumn):
+            embedding_column = embedding_column.name
+
+        distance_type = "EUCLIDEAN"
+        if vector_search_index.distance_strategy == DistanceStrategy.COSINE:
+            distance_type = "COSINE"
+        elif vector_search_index.distance_strategy == DistanceStrategy.DOT_PRODUCT:
+            distance_type = "DOT_PRODUCT"
+
+        options = [
+            f"distance_type = '{distance_type}'",
+            f"tree_depth = {vector_search_index.tree_depth}",
+            f"num_leaves = {vector_search_index.num_leaves}",
+        ]
+
+        if vector_search_index.num_branches is not None:
+            options.append(f"num_branches = {vector_search_index.num_branches}")
+
+        return (
+            f"CREATE VECTOR INDEX {vector_search_index.index_name}\n"
+            f"  ON {table_name}({embedding_column})\n"
+            f"  WHERE {embedding_column} IS NOT NULL\n"
+            f"  OPTIONS ({', '.join(options)})"
+        )
+
     @staticmethod
     def _generate_sql(
         dialect,
@@ -341,10 +621,17 @@ class SpannerVectorStore(VectorStore):
         column_configs,
         primary_key,
         secondary_indexes: Optional[List[SecondaryIndex]] = None,
+        vector_size: Optional[int] = None,
+        interleave_in_parent: Optional[str] = None,
+        normalized_embeddings: bool = False,
     ):
         """
         Generate SQL for creating the vector store table.
 
+        The embedding column defaults to an array of 32 bit floats, which is the precision
+        embedding models produce and the type required by vector indexes. Tables created
+        by earlier versions with ARRAY<FLOAT64> / float8[] embeddings remain supported.
+
         Parameters:
         - dialect: The database dialect.
         - table_name: The name of the table.
@@ -352,6 +639,9 @@ class SpannerVectorStore(VectorStore):
         - content_column: The name of the content column.
         - embedding_column: The name of the embedding column.
         - column_names: List of tuples containing metadata column information.
+        - vector_size: The length of the embedding vectors, enforced by the embedding column.
+        - interleave_in_parent: The name of the parent table to interleave the table in.
+        - normalized_embeddings: Whether to add the check constraint only accepting unit length embeddings.
 
         Returns:
         - str: The generated SQL.
@@ -374,13 +664,17 @@ class SpannerVectorStore(VectorStore):
 
         if not isinstance(embedding_column, TableColumn):
             if dialect == DatabaseDialect.POSTGRESQL:
-                embedding_column = TableColumn(
-                    embedding_column, "float8[]", is_null=True
-                )
+                embedding_type = "float4[]"
+                if vector_size is not None:
+                    embedding_type += " vector length {}".format(vector_size)
             else:
-                embedding_column = TableColumn(
-                    embedding_column, "ARRAY<FLOAT64>", is_null=True
-                )
+                embedding_type = "ARRAY<FLOAT32>"
+                if vector_size is not None:
+                    embedding_type += "(vector_length=>{})".format(vector_size)
+
+            embedding_column = TableColumn(
+                embedding_column, embedding_type, is_null=vector_size is None
+            )
 
         configs = [id_column, content_column, embedding_column]
         configs.extend(column_configs)
@@ -402,6 +696,21 @@ class SpannerVectorStore(VectorStore):
                 column_sql += ",\n"
                 create_table_statement += column_sql
 
+        if normalized_embeddings:
+            # The constraint also marks the table, so stores can check that its
+            # embeddings are normalized. Zero vectors are left as they are.
+            column = embedding_column.name
+            if dialect == DatabaseDialect.POSTGRESQL:
+                dot_product = f"spanner.dot_product({column}, {column})"
+            else:
+                dot_product = f"DOT_PRODUCT({column}, {column})"
+
+            create_table_statement += (
+                "  CONSTRAINT "
+                + _normalized_embeddings_constraint_name(table_name, column)
+                + f" CHECK ({dot_product} = 0 OR ABS({dot_product} - 1) < 0.001),\n"
+            )
+
         # Remove the last comma and newline, add closing parenthesis
         if dialect == DatabaseDialect.POSTGRESQL:
             create_table_statement += "  PRIMARY KEY(" + primary_key + ")\n)"
@@ -413,6 +722,14 @@ class SpannerVectorStore(VectorStore):
                 + ")"
             )
 
+        if interleave_in_parent is not None:
+            if dialect != DatabaseDialect.POSTGRESQL:
+                create_table_statement += ","
+
+            create_table_statement += (
+                "\nINTERLEAVE IN PARENT " + interleave_in_parent + " ON DELETE CASCADE"
+            )
+
         secondary_index_ddl_statements = []
 
         if secondary_indexes is not None:
@@ -489,12 +806,31 @@ class SpannerVectorStore(VectorStore):
 
         instance = self._client.instance(instance_id)
 
-        if not instance.exists():
-            raise Exception("Instance with id-{} doesn't exist.".format(instance_id))
+        # Looking up the dialect takes admin RPCs, so it is done once per database and
+        # process, and later stores skip straight to the table checks.
+        dialect_cache_key = (self._client.project, instance_id, database_id)
+        database_dialect = _DIALECT_CACHE.get(dialect_cache_key)
 
-        self._database = instance.database(database_id)
+        if database_dialect is None:
+            if not instance.exists():
+                raise Exception(
+                    "Instance with id-{} doesn't exist.".format(instance_id)
+                )
 
-        self._database.reload()
+            self._database = instance.database(database_id)
+
+            try:
+                self._database.reload()
+            except NotFound:
+                raise Exception(
+                    "Database with id-{} doesn't exist.".format(database_id)
+                )
+
+            _DIALECT_CACHE[dialect_cache_key] = self._database.database_dialect
+        else:
+            self._database = instance.database(
+                database_id, database_dialect=database_dialect
+            )
 
         self._dialect_semantics: DialectSemantics = GoogleSqlSemnatics()
         types = self.GSQL_TYPES
@@ -503,8 +839,13 @@ class SpannerVectorStore(VectorStore):
             self._dialect_semantics = PGSqlSemnatics()
             types = self.PGSQL_TYPES
 
-        if not self._database.exists():
-            raise Exception("Database with id-{} doesn't exist.".format(database_id))
+            if (
+                query_parameters.algorithm
+                == QueryParameters.NearestNeighborsAlgorithm.APPROXIMATE_NEAREST_NEIGHBOR
+            ):
+                raise ValueError(
+                    "Approximate nearest neighbor search is only supported for GoogleSQL dialect."
+                )
 
         table = self._database.table(table_name)
 
@@ -541,9 +882,101 @@ class SpannerVectorStore(VectorStore):
                 self._metadata_columns.append(metadata_json_column)
 
         self._columns_to_insert = columns_to_insert
+        self._primary_key_columns: Optional[List[str]] = None
 
         self._validate_table_schema(column_type_map, types, default_columns)
 
+        # The metadata columns that can hold NumPy values are resolved once, so the
+        # other columns are inserted without any per value check.
+        self._numeric_metadata_columns: List[str] = []
+        self._container_metadata_columns: List[str] = []
+        for column_name in self._metadata_columns:
+            if column_name == metadata_json_column:
+                continue
+
+            column_type = column_type_map[column_name][1].lower()
+            if (
+                column_type.startswith("array")
+                or column_type.endswith("[]")
+                or column_type in ("json", "jsonb")
+            ):
+                self._container_metadata_columns.append(column_name)
+            elif column_type.split("(")[0] in _NUMERIC_COLUMN_TYPES:
+                self._numeric_metadata_columns.append(column_name)
+
+        # Embeddings of a table with the normalized embeddings constraint are
+        # normalized on insert by every store, so DOT_PRODUCT stores can rely on it.
+        self._normalized_embeddings = self._has_normalized_embeddings_constraint()
+
+        if (
+            query_parameters.distance_strategy == DistanceStrategy.DOT_PRODUCT
+            and not self._normalized_embeddings
+        ):
+            raise Exception(
+                "DistanceStrategy.DOT_PRODUCT requires a table created with distance_strategy=DistanceStrategy.DOT_PRODUCT, table {} is not.".format(
+                    table_name
+                )
+            )
+
+        self._param_placeholder = ("@vector_embedding", "vector_embedding")
+        self._distance_threshold_placeholder = (
+            "@distance_threshold",
+            "distance_threshold",
+        )
+
+        # Placeholders of the per-query embeddings of a batched search, numbered from 1.
+        self._batch_param_placeholder = ("@vector_embedding_{}", "vector_embedding_{}")
+
+        if self._database.database_dialect == DatabaseDialect.POSTGRESQL:
+            self._param_placeholder = ("$1", "p1")
+            self._distance_threshold_placeholder = ("$2", "p2")
+            self._batch_param_placeholder = ("${}", "p{}")
+
+        if (
+            query_parameters.algorithm
+            == QueryParameters.NearestNeighborsAlgorithm.APPROXIMATE_NEAREST_NEIGHBOR
+        ):
+            self._distance_function = (
+                self._dialect_semantics.getApproximateDistanceFunction(
+                    query_parameters.distance_strategy
+                )
+            )
+        else:
+            self._distance_function = self._dialect_semantics.getDistanceFunction(
+                query_parameters.distance_strategy
+            )
+
+        # Over-fetched approximate search candidates are re-ranked by exact distance.
+        self._rerank = (
+            query_parameters.algorithm
+            == QueryParameters.NearestNeighborsAlgorithm.APPROXIMATE_NEAREST_NEIGHBOR
+            and query_parameters.over_fetch > 1
+        )
+
+        # The query embedding is bound with the element type of the embedding column,
+        # which is FLOAT32 for new tables and FLOAT64 for tables of earlier versions.
+        embedding_param_type = param_types.Array(param_types.FLOAT64)
+
+        embedding_column_type = column_type_map[embedding_column][1].lower()
+        if "float32" in embedding_column_type or "real" in embedding_column_type:
+            embedding_param_type = param_types.Array(param_types.FLOAT32)
+
+        self._query_param_types = {self._param_placeholder[1]: embedding_param_type}
+
+        # The embedding is only fetched when needed, e.g. for MMR, since it is by far
+        # the widest column of the row.
+        select_columns = [id_column, content_column] + self._metadata_columns
+        self._column_order_map = self._get_column_order_map(select_columns)
+        self._query_template = self._generate_query_template(select_columns)
+
+        select_columns_with_embedding = select_columns + [embedding_column]
+        self._column_order_map_with_embedding = self._get_column_order_map(
+            select_columns_with_embedding
+        )
+        self._query_template_with_embedding = self._generate_query_template(
+            select_columns_with_embedding
+        )
+
     def _get_column_type_map(self, database, table_name):
         query = """
             SELECT column_name, spanner_type, is_nullable
@@ -562,6 +995,26 @@ class SpannerVectorStore(VectorStore):
 
         return column_type_map
 
+    def _has_normalized_embeddings_constraint(self) -> bool:
+        query = """
+            SELECT constraint_name
+            FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS
+            WHERE TABLE_NAME = {table_name} AND CONSTRAINT_TYPE = 'CHECK'
+        """.format(
+            table_name="'" + self._table_name + "'"
+        )
+
+        with self._database.snapshot() as snapshot:
+            results = snapshot.execute_sql(query)
+            constraint_names = [row[0].lower() for row in results]
+
+        return (
+            _normalized_embeddings_constraint_name(
+                self._table_name, self._embedding_column
+            ).lower()
+            in constraint_names
+        )
+
     def _validate_table_schema(self, column_type_map, types, default_columns):
         if not all(key in column_type_map for key in self._columns_to_insert):
             raise Exception(
@@ -621,13 +1074,17 @@ class SpannerVectorStore(VectorStore):
                     )
 
     def _select_relevance_score_fn(self) -> Callable[[float], float]:
-        if self._query_parameters.distance_strategy == DistanceStrategy.COSINE:
+        if self._query_parameters.distance_strategy in (
+            DistanceStrategy.COSINE,
+            DistanceStrategy.DOT_PRODUCT,
+        ):
+            # DOT_PRODUCT on normalized embeddings yields the cosine distance.
             return self._cosine_relevance_score_fn
         elif self._query_parameters.distance_strategy == DistanceStrategy.EUCLIDEIAN:
             return self._euclidean_relevance_score_fn
         else:
             raise Exception(
-                "Unknown distance strategy: {}, must be cosine or euclidean.",
+                "Unknown distance strategy: {}, must be cosine, euclidean or dot product.",
                 self._query_parameters.distance_strategy,
             )
 
@@ -637,6 +1094,7 @@ class SpannerVectorStore(VectorStore):
         metadatas: Optional[List[dict]] = None,
         ids: Optional[List[str]] = None,
         batch_size: int = 5000,
+        max_concurrent_batches: int = 4,
         **kwargs: Any,
     ) -> List[str]:
         """
@@ -645,72 +1103,206 @@ class SpannerVectorStore(VectorStore):
         Args:
             texts (Iterable[str]): Iterable of strings to add to the vector store.
             metadatas (Optional[List[dict]]): Optional list of metadatas associated with the texts.
-            ids (Optional[List[str]]): Optional list of IDs for the texts.
-            batch_size (int): The batch size for inserting data. Defaults to 5000.
+            ids (Optional[List[str]]): Optional list of IDs for the texts. Random UUIDs are generated when not provided. Rows with existing IDs are overwritten.
+            batch_size (int): The batch size for embedding and inserting data. Defaults to 5000.
+            max_concurrent_batches (int): The number of batches sent together in a single batch write, each committed independently. Defaults to 4.
 
         Returns:
             List[str]: List of IDs of the added texts.
         """
-        texts_list = list(texts)
-        number_of_records = len(texts_list)
-
-        if number_of_records == 0:
+        # The length checks are done up front when the texts are sized, otherwise
+        # per batch while the texts are consumed.
+        if isinstance(texts, Sized):
+            number_of_records = len(texts)
+            self._validate_add_texts_lengths(number_of_records, metadatas, ids)
+
+            if number_of_records == 0:
+                return []
+
+        # The texts are consumed batch by batch, so a generator is never fully
+        # materialized in memory.
+        text_iterator = iter(texts)
+        added_ids: List[str] = []
+        pending_batches: List[List[List[Any]]] = []
+        columns_to_insert: List[str] = []
+
+        texts_batch = list(itertools.islice(text_iterator, batch_size))
+
+        if not texts_batch:
+            self._validate_add_texts_lengths(0, metadatas, ids)
             return []
 
-        if ids is not None and len(ids) != number_of_records:
+        # Embed the next batch in the background while the current one is inserted,
+        # so the wall time approaches max(embed, insert) instead of their sum.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            embed_future = executor.submit(
+                self._embedding_service.embed_documents, texts_batch
+            )
+
+            while texts_batch:
+                embeds = embed_future.result()
+
+                next_texts_batch = list(itertools.islice(text_iterator, batch_size))
+                if next_texts_batch:
+                    embed_future = executor.submit(
+                        self._embedding_service.embed_documents, next_texts_batch
+                    )
+
+                start = len(added_ids)
+                end = start + len(texts_batch)
+
+                # The lengths are checked against the number of texts consumed so far.
+                # Once the last batch is read the count is final, so surplus ids or
+                # metadatas are rejected before the remaining batches are written.
+                self._validate_add_texts_lengths(
+                    end, metadatas, ids, at_least=bool(next_texts_batch)
+                )
+
+                if ids is not None:
+                    ids_batch = ids[start:end]
+                else:
+                    ids_batch = [str(uuid.uuid4()) for _ in texts_batch]
+
+                if metadatas is not None:
+                    metadatas_batch = metadatas[start:end]
+                else:
+                    metadatas_batch = [{} for _ in texts_batch]
+
+                columns_to_insert, rows_to_insert = self._generate_rows_to_insert(
+                    texts_batch, metadatas_batch, ids_batch, embeds
+                )
+                pending_batches.append(rows_to_insert)
+                added_ids.extend(ids_batch)
+
+                if len(pending_batches) >= max_concurrent_batches:
+                    self._insert_data(pending_batches, columns_to_insert)
+                    pending_batches = []
+
+                texts_batch = next_texts_batch
+
+        if pending_batches:
+            self._insert_data(pending_batches, columns_to_insert)
+
+        return added_ids
+
+    @staticmethod
+    def _validate_add_texts_lengths(
+        number_of_records: int,
+        metadatas: Optional[List[dict]],
+        ids: Optional[List[str]],
+        at_least: bool = False,
+    ):
+        """
+        Check the lengths of the ids and metadatas against the number of documents, or
+        only that they cover number_of_records documents when more of them may follow.
+        """
+        expected = "Expected at least" if at_least else "Expected"
+
+        if ids is not None and (
+            len(ids) < number_of_records
+            or (not at_least and len(ids) != number_of_records)
+        ):
             raise ValueError(
-                f"size of list of IDs should be equals to number of documents. Expected: {number_of_records}  but found {len(ids)}"
+                f"size of list of IDs should be equals to number of documents. {expected}: {number_of_records}  but found {len(ids)}"
             )
 
-        if metadatas is not None and len(metadatas) != number_of_records:
+        if metadatas is not None and (
+            len(metadatas) < number_of_records
+            or (not at_least and len(metadatas) != number_of_records)
+        ):
             raise ValueError(
-                f"size of list of metadatas should be equals to number of documents. Expected: {number_of_records}  but found {len(metadatas)}"
+                f"size of list of metadatas should be equals to number of documents. {expected}: {number_of_records}  but found {len(metadatas)}"
             )
 
-        embeds = self._embedding_service.embed_documents(texts_list)
+    def _generate_rows_to_insert(
+        self,
+        texts: List[str],
+        metadatas: List[dict],
+        ids: List[str],
+        embeds: List[List[float]],
+    ) -> Tuple[List[str], List[List[Any]]]:
+        """
+        Pivot a batch of texts, metadatas, ids and embeddings into rows for insertion.
 
-        if metadatas is None:
-            metadatas = [{} for _ in texts]
+        Returns:
+            Tuple[List[str], List[List[Any]]]: The columns to insert and the rows.
+        """
+        if self._normalized_embeddings:
+            embeds = _normalize_embeddings(embeds)
 
+        metadata_json_column = self._metadata_json_column
         values_dict: dict = {key: [] for key in self._metadata_columns}
+        numeric_columns = [
+            (column_name, values_dict[column_name])
+            for column_name in self._numeric_metadata_columns
+        ]
+        container_columns = [
+            (column_name, values_dict[column_name])
+            for column_name in self._container_metadata_columns
+        ]
+        other_columns = [
+            (column_name, values_dict[column_name])
+            for column_name in self._metadata_columns
+            if column_name != metadata_json_column
+            and column_name not in self._numeric_metadata_columns
+            and column_name not in self._container_metadata_columns
+        ]
+        json_values = (
+            values_dict[metadata_json_column]
+            if metadata_json_column is not None
+            else None
+        )
 
-        if metadatas:
-            for row_metadata in metadatas:
-                if self._metadata_json_column is not None:
-                    row_metadata[self._metadata_json_column] = JsonObject(row_metadata)
+        for row_metadata in metadatas:
+            # The JSON payload is a copy of the whole metadata dict, built once per row
+            # without writing it back into the caller's metadata.
+            if json_values is not None:
+                json_values.append(JsonObject(_from_numpy(row_metadata)))
 
-                for column_name in self._metadata_columns:
-                    if row_metadata.get(column_name) is not None:
-                        values_dict[column_name].append(row_metadata[column_name])
-                    else:
-                        values_dict[column_name].append(None)
+            get_value = row_metadata.get
+            for column_name, column_values in other_columns:
+                column_values.append(get_value(column_name))
 
-        if ids is not None:
-            values_dict[self._id_column] = ids
+            for column_name, column_values in numeric_columns:
+                value = get_value(column_name)
+                if isinstance(value, np.generic):
+                    value = value.item()
+                column_values.append(value)
+
+            for column_name, column_values in container_columns:
+                column_values.append(_from_numpy(get_value(column_name)))
 
+        values_dict[self._id_column] = ids
         values_dict[self._content_column] = texts
         values_dict[self._embedding_column] = embeds
 
-        columns_to_insert = values_dict.keys()
+        columns_to_insert = list(values_dict.keys())
 
-        rows_to_insert = [
-            [values_dict[key][i] for key in values_dict]
-            for i in range(number_of_records)
-        ]
-
-        for i in range(0, len(rows_to_insert), batch_size):
-            batch = rows_to_insert[i : i + batch_size]
-            self._insert_data(batch, columns_to_insert)
+        # Transpose the column lists into rows with zip, which runs in C.
+        rows_to_insert = list(
+            map(list, zip(*[values_dict[key] for key in columns_to_insert]))
+        )
 
-        return ids if ids is not None else []
+        return columns_to_insert, rows_to_insert
+
+    def _insert_data(self, records_batches, columns_to_insert):
+        # Every batch is its own mutation group, so all of them are sent in a single
+        # streaming batch write and committed in parallel by Spanner. Batch writes
+        # can be replayed, so the rows are upserted to make the groups idempotent.
+        with self._database.mutation_groups() as groups:
+            for records in records_batches:
+                group = groups.group()
+                group.insert_or_update(
+                    table=self._table_name,
+                    columns=columns_to_insert,
+                    values=records,
+                )
 
-    def _insert_data(self, records, columns_to_insert):
-        with self._database.batch() as batch:
-            batch.insert(
-                table=self._table_name,
-                columns=columns_to_insert,
-                values=records,
-            )
+            for response in groups.batch_write():
+                if response.status.code != code_pb2.OK:
+                    raise Exception(
+                        "Failed to insert records: {}".format(response.status.message)
+                    )
 
     def add_documents(
         self,
@@ -747,17 +1339,22 @@ class SpannerVectorStore(VectorStore):
 
         Returns:
             Optional[bool]: True if deletion is successful, False otherwise, None if not implemented.
+            Deleting by ids returns True once the deletes are committed, whether or not rows matched.
         """
         if ids is None and documents is None:
             raise Exception("Pass id/documents to delete")
 
+        if ids is not None:
+            primary_key_columns = self._get_primary_key_columns()
+
+            if primary_key_columns[0] == self._id_column:
+                return self._delete_by_keys(ids, len(primary_key_columns) == 1)
+            return self._delete_by_ids(ids)
+
         columns = []
         values: List[Any] = []
 
-        if ids is not None:
-            columns = [self._id_column]
-            values = ["('" + value + "')" for value in ids]
-        elif documents is not None:
+        if documents is not None:
             columns = [self._content_column] + self._metadata_columns
 
             if self._metadata_json_column is not None:
@@ -786,6 +1383,7 @@ class SpannerVectorStore(VectorStore):
 
             # Concatenate the conditions with the base DELETE statement
             sql_delete = base_delete_statement + where_clause
+            logger.debug("Deleting documents, sql=%s values=%s", sql_delete, values)
 
             # Iterate over the list of lists of values
             for value_tuple in values:
@@ -810,11 +1408,90 @@ class SpannerVectorStore(VectorStore):
             return True
         return None
 
+    def _get_primary_key_columns(self) -> List[str]:
+        """
+        Look up the primary key columns of the table, in key order. The lookup is done
+        on the first delete by ids and cached for the lifetime of the store.
+        """
+        if self._primary_key_columns is None:
+            query = """
+                SELECT column_name
+                FROM INFORMATION_SCHEMA.INDEX_COLUMNS
+                WHERE TABLE_NAME = {table_name} AND INDEX_NAME = 'PRIMARY_KEY'
+                ORDER BY ORDINAL_POSITION
+            """.format(
+                table_name="'" + self._table_name + "'"
+            )
+
+            with self._database.snapshot() as snapshot:
+                results = snapshot.execute_sql(query)
+                self._primary_key_columns = [row[0] for row in results]
+
+        return self._primary_key_columns
+
+    def _delete_by_keys(self, ids: List[str], is_full_key: bool) -> bool:
+        """
+        Delete records by id with delete mutations, which skip parsing and planning a
+        DML statement. When the primary key has more columns than the id, every row
+        whose key starts with the id is deleted through a key range.
+        """
+        logger.debug("Deleting ids with mutations, ids=%s", ids)
+
+        # Each chunk is committed separately to stay under Spanner's mutation limit.
+        for i in range(0, len(ids), DELETE_BATCH_SIZE):
+            ids_batch = ids[i : i + DELETE_BATCH_SIZE]
+
+            if is_full_key:
+                keyset = KeySet(keys=[[id_value] for id_value in ids_batch])
+            else:
+                keyset = KeySet(
+                    ranges=[
+                        KeyRange(start_closed=[id_value], end_closed=[id_value])
+                        for id_value in ids_batch
+                    ]
+                )
+
+            with self._database.batch() as batch:
+                batch.delete(self._table_name, keyset)
+
+        # Delete mutations don't report the number of deleted rows.
+        return True
+
+    def _delete_by_ids(self, ids: List[str]) -> bool:
+        """
+        Delete records by id with a single DML statement per chunk of ids, binding the
+        ids as one array parameter so the statement text doesn't depend on their count.
+        Used when the id column is not the leading primary key column.
+        """
+        where_clause, parameter = self._dialect_semantics.getDeleteIdsParameters(
+            self._id_column
+        )
+        sql_delete = "DELETE FROM {} WHERE {}".format(self._table_name, where_clause)
+        logger.debug("Deleting ids, sql=%s ids=%s", sql_delete, ids)
+
+        def delete_records(transaction, ids_batch):
+            transaction.execute_update(
+                dml=sql_delete,
+                params={parameter: ids_batch},
+                param_types={parameter: param_types.Array(param_types.STRING)},
+            )
+
+        # Each chunk is committed separately to stay under Spanner's mutation limit.
+        for i in range(0, len(ids), DELETE_BATCH_SIZE):
+            self._database.run_in_transaction(
+                delete_records, ids[i : i + DELETE_BATCH_SIZE]
+            )
+
+        # Like delete mutations, which don't report the number of deleted rows, the
+        # result doesn't depend on whether any row matched.
+        return True
+
     def similarity_search_with_score_by_vector(
         self,
         embedding: List[float],
         k: int = 4,
         pre_filter: Optional[str] = None,
+        distance_threshold: Optional[float] = None,
         **kwargs: Any,
     ) -> List[Tuple[Document, float]]:
         """
@@ -824,13 +1501,14 @@ class SpannerVectorStore(VectorStore):
             query (str): The query string.
             k (int): The number of nearest neighbors to retrieve. Defaults to 4.
             pre_filter (Optional[str]): Pre-filter condition for the query. Defaults to None.
+            distance_threshold (Optional[float]): Maximum distance of the retrieved neighbors, applied in the query. Defaults to None.
 
         Returns:
             List[Document]: List of documents most similar to the query.
         """
 
         results, column_order_map = self._get_rows_by_similarity_search(
-            embedding, k, pre_filter
+            embedding, k, pre_filter, distance_threshold=distance_threshold
         )
         documents = self._get_documents_from_query_results(
             list(results), column_order_map
@@ -842,52 +1520,278 @@ class SpannerVectorStore(VectorStore):
         embedding: List[float],
         k: int,
         pre_filter: Optional[str] = None,
+        include_embedding: bool = False,
+        distance_threshold: Optional[float] = None,
         **kwargs: Any,
     ):
         staleness = self._query_parameters.staleness
+        parameter = self._param_placeholder
+        params: Dict[str, Any] = {}
+        query_param_types = self._query_param_types
 
-        distance_function = self._dialect_semantics.getDistanceFunction(
-            self._query_parameters.distance_strategy
-        )
+        rerank = self._rerank
 
-        parameter = ("@vector_embedding", "vector_embedding")
+        if rerank:
+            include_embedding = True
+            k_count = k * self._query_parameters.over_fetch
+        else:
+            k_count = k
 
-        if self._database.database_dialect == DatabaseDialect.POSTGRESQL:
-            parameter = ("$1", "p1")
+        query_template = self._query_template
+        column_order_map = self._column_order_map
 
-        select_column_names = ",".join(self._columns_to_insert) + ","
-        column_order_map = {
-            value: index for index, value in enumerate(self._columns_to_insert)
-        }
-        column_order_map[KNN_DISTANCE_SEARCH_QUERY_ALIAS] = len(self._columns_to_insert)
+        if include_embedding:
+            query_template = self._query_template_with_embedding
+            column_order_map = self._column_order_map_with_embedding
 
-        sql_query = """
-            SELECT {select_column_names} {distance_function}({embedding_column}, {vector_embedding_placeholder}) AS {distance_alias}
-            FROM {table_name}
-            WHERE {filter}
-            ORDER BY distance
-            LIMIT {k_count};
-        """.format(
-            table_name=self._table_name,
-            embedding_column=self._embedding_column,
-            select_column_names=select_column_names,
-            vector_embedding_placeholder=parameter[0],
+        sql_query = query_template.format(
             filter=pre_filter if pre_filter is not None else "1 = 1",
-            k_count=k,
-            distance_function=distance_function,
-            distance_alias=KNN_DISTANCE_SEARCH_QUERY_ALIAS,
+            k_count=k_count,
         )
 
+        # Re-ranked candidates are filtered by their exact distance on the client, as
+        # filtering by the approximate distance could drop some within the threshold.
+        if distance_threshold is not None and not rerank:
+            threshold_parameter = self._distance_threshold_placeholder
+            sql_query = """
+                SELECT * FROM ({sql_query}) AS neighbors
+                WHERE {distance_alias} <= {threshold_placeholder}
+                ORDER BY {distance_alias}
+            """.format(
+                sql_query=sql_query,
+                distance_alias=KNN_DISTANCE_SEARCH_QUERY_ALIAS,
+                threshold_placeholder=threshold_parameter[0],
+            )
+            params[threshold_parameter[1]] = distance_threshold
+            query_param_types = dict(query_param_types)
+            query_param_types[threshold_parameter[1]] = param_types.FLOAT64
+
+        if self._query_parameters.distance_strategy == DistanceStrategy.DOT_PRODUCT:
+            embedding = _normalize_embeddings([embedding])[0]
+
+        params[parameter[1]] = embedding
+
         with self._database.snapshot(
             **staleness if staleness is not None else {}
         ) as snapshot:
             results = snapshot.execute_sql(
                 sql=sql_query,
-                params={parameter[1]: embedding},
-                param_types={parameter[1]: param_types.Array(param_types.FLOAT64)},
+                params=params,
+                param_types=query_param_types,
+                request_options=self._query_parameters.request_options,
             )
 
-            return list(results), column_order_map
+            results = list(results)
+
+        if rerank:
+            results = self._rerank_by_exact_distance(
+                results, column_order_map, embedding, k
+            )
+
+            if distance_threshold is not None:
+                distance_index = column_order_map[KNN_DISTANCE_SEARCH_QUERY_ALIAS]
+                results = [
+                    row for row in results if row[distance_index] <= distance_threshold
+                ]
+
+        return results, column_order_map
+
+    def _rerank_by_exact_distance(
+        self,
+        rows: List[List[Any]],
+        column_order_map: Dict[str, int],
+        embedding: List[float],
+        k: int,
+    ) -> List[List[Any]]:
+        """
+        Re-rank the candidates of an approximate search by their exact distance to the
+        embedding, computed for all of them in a single vectorized operation, and keep
+        the k nearest ones.
+        """
+        if len(rows) == 0:
+            return rows
+
+        embedding_index = column_order_map[self._embedding_column]
+        distance_index = column_order_map[KNN_DISTANCE_SEARCH_QUERY_ALIAS]
+
+        candidates = np.asarray(
+            [row[embedding_index] for row in rows], dtype=np.float32
+        )
+        query = np.asarray(embedding, dtype=np.float32)
+
+        distance_strategy = self._query_parameters.distance_strategy
+        if distance_strategy == DistanceStrategy.EUCLIDEIAN:
+            distances = np.linalg.norm(candidates - query, axis=1)
+        elif distance_strategy == DistanceStrategy.DOT_PRODUCT:
+            distances = 1 - candidates @ query
+        else:
+            norms = np.linalg.norm(candidates, axis=1) * np.linalg.norm(query)
+            norms[norms == 0] = 1.0
+            distances = 1 - (candidates @ query) / norms
+
+        reranked_rows = []
+        for index in np.argsort(distances, kind="stable")[:k]:
+            row = list(rows[index])
+            row[distance_index] = float(distances[index])
+            reranked_rows.append(row)
+
+        return reranked_rows
+
+    def _get_rows_by_similarity_search_batch(
+        self,
+        embeddings: List[List[float]],
+        k: int,
+        pre_filter: Optional[str] = None,
+    ):
+        """
+        Run the nearest neighbor search of every embedding in a single query, combining
+        the per-embedding searches with UNION ALL, and group the rows by embedding.
+        """
+        staleness = self._query_parameters.staleness
+        filter = pre_filter if pre_filter is not None else "1 = 1"
+
+        if self._query_parameters.distance_strategy == DistanceStrategy.DOT_PRODUCT:
+            embeddings = _normalize_embeddings(embeddings)
+
+        select_columns = [
+            self._id_column,
+            self._content_column,
+        ] + self._metadata_columns
+
+        k_count = k
+        if self._rerank:
+            select_columns.append(self._embedding_column)
+            k_count = k * self._query_parameters.over_fetch
+        embedding_param_type = self._query_param_types[self._param_placeholder[1]]
+
+        sub_queries = []
+        params = {}
+        query_param_types = {}
+
+        for index, embedding in enumerate(embeddings):
+            parameter = (
+                self._batch_param_placeholder[0].format(index + 1),
+                self._batch_param_placeholder[1].format(index + 1),
+            )
+
+            query_template = self._generate_query_template(
+                select_columns + ["{} AS {}".format(index, QUERY_INDEX_ALIAS)],
+                parameter,
+            )
+            sub_queries.append(
+                "(" + query_template.format(filter=filter, k_count=k_count) + ")"
+            )
+            params[parameter[1]] = embedding
+            query_param_types[parameter[1]] = embedding_param_type
+
+        column_order_map = self._get_column_order_map(
+            select_columns + [QUERY_INDEX_ALIAS]
+        )
+
+        with self._database.snapshot(
+            **staleness if staleness is not None else {}
+        ) as snapshot:
+            results = snapshot.execute_sql(
+                sql=" UNION ALL ".join(sub_queries),
+                params=params,
+                param_types=query_param_types,
+                request_options=self._query_parameters.request_options,
+            )
+
+            grouped_results: List[List[Any]] = [[] for _ in embeddings]
+            for row in results:
+                grouped_results[row[column_order_map[QUERY_INDEX_ALIAS]]].append(row)
+
+        if self._rerank:
+            grouped_results = [
+                self._rerank_by_exact_distance(rows, column_order_map, embedding, k)
+                for rows, embedding in zip(grouped_results, embeddings)
+            ]
+        else:
+            # UNION ALL doesn't preserve the order of the sub queries' rows.
+            distance_index = column_order_map[KNN_DISTANCE_SEARCH_QUERY_ALIAS]
+            for rows in grouped_results:
+                rows.sort(key=lambda row: row[distance_index])
+
+        return grouped_results, column_order_map
+
+    @staticmethod
+    def _get_column_order_map(select_columns: List[str]) -> Dict[str, int]:
+        column_order_map = {value: index for index, value in enumerate(select_columns)}
+        column_order_map[KNN_DISTANCE_SEARCH_QUERY_ALIAS] = len(select_columns)
+        return column_order_map
+
+    def _generate_query_template(
+        self,
+        select_columns: List[str],
+        param_placeholder: Optional[Tuple[str, str]] = None,
+    ) -> str:
+        """
+        Generate the similarity search query once per store. The filter and the number of
+        neighbors are left as ``{filter}`` and ``{k_count}`` str.format slots.
+
+        With APPROXIMATE_NEAREST_NEIGHBOR the rows are ranked using the vector index
+        instead of computing the exact distance for every row.
+        """
+        if param_placeholder is None:
+            param_placeholder = self._param_placeholder
+
+        table = self._table_name
+        where = "{filter}"
+        order_by = KNN_DISTANCE_SEARCH_QUERY_ALIAS
+
+        if (
+            self._query_parameters.algorithm
+            == QueryParameters.NearestNeighborsAlgorithm.APPROXIMATE_NEAREST_NEIGHBOR
+        ):
+            distance_call = (
+                "{}({}, {}, options => JSON '{{\"num_leaves_to_search\": {}}}')".format(
+                    self._distance_function,
+                    self._embedding_column,
+                    param_placeholder[0],
+                    self._query_parameters.num_leaves_to_search,
+                )
+            )
+            table = "{}@{{FORCE_INDEX={}}}".format(
+                table, self._query_parameters.vector_index_name
+            )
+            where = "{} IS NOT NULL AND ({{filter}})".format(self._embedding_column)
+
+            # The vector index is only used when the rows are ordered by the APPROX_*
+            # call itself, which is a similarity for dot product.
+            order_by = distance_call
+            if self._query_parameters.distance_strategy == DistanceStrategy.DOT_PRODUCT:
+                order_by += " DESC"
+        else:
+            distance_call = "{}({}, {})".format(
+                self._distance_function, self._embedding_column, param_placeholder[0]
+            )
+
+        return """
+            SELECT {select_column_names} {distance_expression} AS {distance_alias}
+            FROM {table_name}
+            WHERE {where}
+            ORDER BY {order_by}
+            LIMIT {{k_count}}
+        """.format(
+            select_column_names=",".join(select_columns) + ",",
+            distance_expression=_escape_format_braces(
+                self._distance_expression(distance_call)
+            ),
+            distance_alias=KNN_DISTANCE_SEARCH_QUERY_ALIAS,
+            table_name=_escape_format_braces(table),
+            where=where,
+            order_by=_escape_format_braces(order_by),
+        )
+
+    def _distance_expression(self, distance_call: str) -> str:
+        """
+        Turn the distance function call into the selected distance. Dot product is a
+        similarity, so it is converted to the cosine distance of the normalized embeddings.
+        """
+        if self._query_parameters.distance_strategy == DistanceStrategy.DOT_PRODUCT:
+            return "(1 - {})".format(distance_call)
+        return distance_call
 
     def _get_documents_from_query_results(
         self, results: List[List], column_order_map: Dict[str, int]
@@ -921,6 +1825,7 @@ class SpannerVectorStore(VectorStore):
         query: str,
         k: int = 4,
         pre_filter: Optional[str] = None,
+        distance_threshold: Optional[float] = None,
         **kwargs: Any,
     ) -> List[Document]:
         """
@@ -930,13 +1835,17 @@ class SpannerVectorStore(VectorStore):
             query (str): The query string.
             k (int): The number of nearest neighbors to retrieve. Defaults to 4.
             pre_filter (Optional[str]): Pre-filter condition for the query. Defaults to None.
+            distance_threshold (Optional[float]): Maximum distance of the retrieved neighbors, applied in the query. Defaults to None.
 
         Returns:
             List[Document]: List of documents most similar to the query.
         """
         embedding = self._embedding_service.embed_query(query)
         documents = self.similarity_search_with_score_by_vector(
-            embedding=embedding, k=k, pre_filter=pre_filter
+            embedding=embedding,
+            k=k,
+            pre_filter=pre_filter,
+            distance_threshold=distance_threshold,
         )
         return [doc for doc, _ in documents]
 
@@ -945,6 +1854,7 @@ class SpannerVectorStore(VectorStore):
         query: str,
         k: int = 4,
         pre_filter: Optional[str] = None,
+        distance_threshold: Optional[float] = None,
         **kwargs: Any,
     ) -> List[Tuple[Document, float]]:
         """
@@ -954,21 +1864,63 @@ class SpannerVectorStore(VectorStore):
             query (str): The query string.
             k (int): The number of nearest neighbors to retrieve. Defaults to 4.
             pre_filter (Optional[str]): Pre-filter condition for the query. Defaults to None.
+            distance_threshold (Optional[float]): Maximum distance of the retrieved neighbors, applied in the query. Defaults to None.
 
         Returns:
             List[Tuple[Document, float]]: List of tuples containing Document and similarity score.
         """
         embedding = self._embedding_service.embed_query(query)
         documents = self.similarity_search_with_score_by_vector(
-            embedding=embedding, k=k, pre_filter=pre_filter
+            embedding=embedding,
+            k=k,
+            pre_filter=pre_filter,
+            distance_threshold=distance_threshold,
         )
         return documents
 
+    def similarity_search_batch(
+        self,
+        queries: List[str],
+        k: int = 4,
+        pre_filter: Optional[str] = None,
+        **kwargs: Any,
+    ) -> List[List[Document]]:
+        """
+        Perform similarity search for multiple queries, embedding all of them in a single
+        call and searching for all of them in a single query.
+
+        Args:
+            queries (List[str]): The query strings.
+            k (int): The number of nearest neighbors to retrieve per query. Defaults to 4.
+            pre_filter (Optional[str]): Pre-filter condition for the queries. Defaults to None.
+
+        Returns:
+            List[List[Document]]: List of documents most similar to each query, in the order of the queries.
+        """
+        if len(queries) == 0:
+            return []
+
+        embeddings = self._embedding_service.embed_documents(queries)
+        grouped_results, column_order_map = self._get_rows_by_similarity_search_batch(
+            embeddings, k, pre_filter
+        )
+
+        return [
+            [
+                doc
+                for doc, _ in self._get_documents_from_query_results(
+                    results, column_order_map
+                )
+            ]
+            for results in grouped_results
+        ]
+
     def similarity_search_by_vector(
         self,
         embedding: List[float],
         k: int = 4,
         pre_filter: Optional[str] = None,
+        distance_threshold: Optional[float] = None,
         **kwargs: Any,
     ) -> List[Document]:
         """
@@ -978,12 +1930,16 @@ class SpannerVectorStore(VectorStore):
             embedding (List[float]): The embedding vector.
             k (int): The number of nearest neighbors to retrieve. Defaults to 4.
             pre_filter (Optional[str]): Pre-filter condition for the query. Defaults to None.
+            distance_threshold (Optional[float]): Maximum distance of the retrieved neighbors, applied in the query. Defaults to None.
 
         Returns:
             List[Document]: List of documents most similar to the query.
         """
         documents = self.similarity_search_with_score_by_vector(
-            embedding=embedding, k=k, pre_filter=pre_filter
+            embedding=embedding,
+            k=k,
+            pre_filter=pre_filter,
+            distance_threshold=distance_threshold,
         )
         return [doc for doc, _ in documents]
 
@@ -1015,7 +1971,7 @@ class SpannerVectorStore(VectorStore):
                 relevance and score for each.
         """
         results, column_order_map = self._get_rows_by_similarity_search(
-            embedding, fetch_k, pre_filter
+            embedding, fetch_k, pre_filter, include_embedding=True
         )
 
         embeddings = [
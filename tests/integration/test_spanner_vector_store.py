@@ -16,16 +16,19 @@ import datetime
 import os
 import uuid
 
+import numpy as np
 import pytest
 from google.cloud.spanner import Client  # type: ignore
+from google.cloud.spanner_v1 import param_types
 from langchain_community.document_loaders import HNLoader
-from langchain_community.embeddings import FakeEmbeddings
+from langchain_community.embeddings import DeterministicFakeEmbedding, FakeEmbeddings
 
 from langchain_google_spanner.vector_store import (  # type: ignore
     DistanceStrategy,
     QueryParameters,
     SpannerVectorStore,
     TableColumn,
+    VectorSearchIndex,
 )
 
 project_id = os.environ["PROJECT_ID"]
@@ -140,6 +143,63 @@ class TestStaticUtilityGoogleSQL:
             primary_key="product_name, title, product_id",
         )
 
+    def test_init_vector_store_table_with_vector_index(self, client):
+        index_name = "embedding_index" + table_name
+
+        SpannerVectorStore.init_vector_store_table(
+            instance_id=instance_id,
+            database_id=google_database,
+            table_name=table_name,
+            embedding_column=TableColumn(
+                name="embedding",
+                type="ARRAY<FLOAT32>(vector_length=>3)",
+                is_null=True,
+            ),
+            metadata_columns=[
+                TableColumn(name="title", type="STRING(1024)"),
+            ],
+            vector_search_index=VectorSearchIndex(
+                index_name=index_name,
+                num_leaves=10,
+                distance_strategy=DistanceStrategy.COSINE,
+            ),
+        )
+
+        # The table can't be dropped by the cleanup while it still has the index.
+        database = client.instance(instance_id).database(google_database)
+        operation = database.update_ddl([f"DROP VECTOR INDEX {index_name}"])
+        operation.result(OPERATION_TIMEOUT_SECONDS)
+
+    def test_init_vector_store_table_interleaved(self, client):
+        parent_table_name = "parent_" + table_name
+        database = client.instance(instance_id).database(google_database)
+        operation = database.update_ddl(
+            [
+                f"CREATE TABLE {parent_table_name} (product_id STRING(36) NOT NULL) PRIMARY KEY(product_id)"
+            ]
+        )
+        operation.result(OPERATION_TIMEOUT_SECONDS)
+
+        try:
+            SpannerVectorStore.init_vector_store_table(
+                instance_id=instance_id,
+                database_id=google_database,
+                table_name=table_name,
+                metadata_columns=[
+                    TableColumn(name="product_id", type="STRING(36)", is_null=False),
+                ],
+                primary_key="product_id, langchain_id",
+                interleave_in_parent=parent_table_name,
+            )
+        finally:
+            operation = database.update_ddl(
+                [
+                    f"DROP TABLE IF EXISTS {table_name}",
+                    f"DROP TABLE IF EXISTS {parent_table_name}",
+                ]
+            )
+            operation.result(OPERATION_TIMEOUT_SECONDS)
+
 
 class TestStaticUtilityPGSQL:
     @pytest.fixture(autouse=True)
@@ -284,6 +344,136 @@ class TestSpannerVectorStoreGoogleSQL:
         )
         assert ids == ids_row_inserted
 
+    def test_spanner_vector_add_data3(self, client, setup_database):
+        loader, embeddings = setup_database
+        numpy_table_name = "numpy_" + table_name
+
+        SpannerVectorStore.init_vector_store_table(
+            instance_id=instance_id,
+            database_id=google_database,
+            table_name=numpy_table_name,
+            id_column="row_id",
+            metadata_columns=[
+                TableColumn(name="metadata", type="JSON", is_null=True),
+                TableColumn(name="title", type="STRING(MAX)", is_null=True),
+                TableColumn(name="price", type="INT64", is_null=True),
+                TableColumn(name="rating", type="FLOAT64", is_null=True),
+                TableColumn(name="scores", type="ARRAY<FLOAT64>", is_null=True),
+            ],
+        )
+
+        try:
+            db = SpannerVectorStore(
+                instance_id=instance_id,
+                database_id=google_database,
+                table_name=numpy_table_name,
+                id_column="row_id",
+                ignore_metadata_columns=[],
+                embedding_service=embeddings,
+                metadata_json_column="metadata",
+            )
+
+            ids = db.add_texts(
+                texts=["Langchain Test Text 6", "Langchain Test Text 7"],
+                metadatas=[
+                    {
+                        "title": "Title 6",
+                        "price": np.int64(6),
+                        "rating": np.float32(4.5),
+                        "scores": np.array([0.5, 1.5]),
+                    },
+                    {"title": "Title 7", "price": 7, "rating": 3.5, "scores": [2.5]},
+                ],
+            )
+
+            database = client.instance(instance_id).database(google_database)
+            with database.snapshot() as snapshot:
+                results = snapshot.execute_sql(
+                    f"SELECT title, price, rating, scores, metadata FROM {numpy_table_name} WHERE row_id IN UNNEST(@ids) ORDER BY price",
+                    params={"ids": ids},
+                    param_types={"ids": param_types.Array(param_types.STRING)},
+                )
+                rows = list(results)
+
+            assert [row[:4] for row in rows] == [
+                ["Title 6", 6, 4.5, [0.5, 1.5]],
+                ["Title 7", 7, 3.5, [2.5]],
+            ]
+            assert rows[0][4]["price"] == 6
+            assert rows[0][4]["rating"] == 4.5
+            assert rows[0][4]["scores"] == [0.5, 1.5]
+        finally:
+            database = client.instance(instance_id).database(google_database)
+            operation = database.update_ddl(
+                [f"DROP TABLE IF EXISTS {numpy_table_name}"]
+            )
+            operation.result(OPERATION_TIMEOUT_SECONDS)
+
+    def test_spanner_vector_add_data_in_batches(self, client, setup_database):
+        loader, embeddings = setup_database
+
+        db = SpannerVectorStore(
+            instance_id=instance_id,
+            database_id=google_database,
+            table_name=table_name,
+            id_column="row_id",
+            ignore_metadata_columns=[],
+            embedding_service=embeddings,
+            metadata_json_column="metadata",
+        )
+        database = client.instance(instance_id).database(google_database)
+
+        def read_titles(ids):
+            with database.snapshot() as snapshot:
+                results = snapshot.execute_sql(
+                    f"SELECT row_id, title FROM {table_name} WHERE row_id IN UNNEST(@ids)",
+                    params={"ids": ids},
+                    param_types={"ids": param_types.Array(param_types.STRING)},
+                )
+                return {row[0]: row[1] for row in results}
+
+        # A generator of 5 texts is consumed in 3 batches, each written on its own.
+        ids = [str(uuid.uuid4()) for _ in range(5)]
+        ids_row_inserted = db.add_texts(
+            texts=("Langchain Batch Text {}".format(i) for i in range(5)),
+            metadatas=[{"title": "Batch Title {}".format(i)} for i in range(5)],
+            ids=ids,
+            batch_size=2,
+            max_concurrent_batches=1,
+        )
+
+        assert ids_row_inserted == ids
+        assert read_titles(ids) == {
+            id_value: "Batch Title {}".format(i) for i, id_value in enumerate(ids)
+        }
+
+        # Surplus ids are only known once the generator is exhausted, and are
+        # rejected before the last batch is written.
+        ids = [str(uuid.uuid4()) for _ in range(4)]
+        with pytest.raises(ValueError):
+            db.add_texts(
+                texts=("Langchain Batch Text {}".format(i) for i in range(3)),
+                metadatas=[{"title": "Batch Title {}".format(i)} for i in range(3)],
+                ids=ids,
+                batch_size=2,
+                max_concurrent_batches=1,
+            )
+
+        assert sorted(read_titles(ids).keys()) == sorted(ids[:2])
+
+        # Missing metadatas are rejected before the batch lacking them is written.
+        ids = [str(uuid.uuid4()) for _ in range(3)]
+        with pytest.raises(ValueError):
+            db.add_texts(
+                texts=("Langchain Batch Text {}".format(i) for i in range(3)),
+                metadatas=[{"title": "Batch Title 0"}],
+                ids=ids,
+                batch_size=2,
+                max_concurrent_batches=1,
+            )
+
+        assert read_titles(ids) == {}
+
     def test_spanner_vector_delete_data(self, setup_database):
         loader, embeddings = setup_database
 
@@ -303,6 +493,40 @@ class TestSpannerVectorStoreGoogleSQL:
 
         assert deleted == True
 
+    def test_spanner_vector_delete_data_by_ids(self, client, setup_database):
+        loader, embeddings = setup_database
+
+        db = SpannerVectorStore(
+            instance_id=instance_id,
+            database_id=google_database,
+            table_name=table_name,
+            id_column="row_id",
+            ignore_metadata_columns=[],
+            embedding_service=embeddings,
+            metadata_json_column="metadata",
+        )
+
+        ids = db.add_texts(
+            texts=["Langchain Test Text 4", "Langchain Test Text 5"],
+            metadatas=[{"title": "Title 4"}, {"title": "Title 5"}],
+        )
+
+        deleted = db.delete(ids=ids)
+
+        assert deleted == True
+
+        database = client.instance(instance_id).database(google_database)
+        with database.snapshot() as snapshot:
+            results = snapshot.execute_sql(
+                f"SELECT row_id FROM {table_name} WHERE row_id IN UNNEST(@ids)",
+                params={"ids": ids},
+                param_types={"ids": param_types.Array(param_types.STRING)},
+            )
+            assert list(results) == []
+
+        # Deleting ids without matching rows succeeds the same way.
+        assert db.delete(ids=ids) == True
+
     def test_spanner_vector_search_data1(self, setup_database):
         loader, embeddings = setup_database
 
@@ -343,6 +567,31 @@ class TestSpannerVectorStoreGoogleSQL:
 
         assert len(docs) == 3
 
+    def test_spanner_vector_search_batch(self, setup_database):
+        loader, embeddings = setup_database
+
+        # The queries must embed to the same vectors in the batched and the single
+        # searches.
+        db = SpannerVectorStore(
+            instance_id=instance_id,
+            database_id=google_database,
+            table_name=table_name,
+            id_column="row_id",
+            ignore_metadata_columns=[],
+            embedding_service=DeterministicFakeEmbedding(size=3),
+            metadata_json_column="metadata",
+        )
+
+        queries = [
+            "Testing the langchain integration with spanner",
+            "Testing batched search with spanner",
+        ]
+        docs = db.similarity_search_batch(queries, k=2)
+
+        assert len(docs) == 2
+        for query, query_docs in zip(queries, docs):
+            assert query_docs == db.similarity_search(query, k=2)
+
     def test_spanner_vector_search_data3(self, setup_database):
         loader, embeddings = setup_database
 
@@ -388,6 +637,304 @@ class TestSpannerVectorStoreGoogleSQL:
 
         assert len(docs) == 3
 
+    def test_spanner_vector_search_with_distance_threshold(self, setup_database):
+        loader, embeddings = setup_database
+
+        db = SpannerVectorStore(
+            instance_id=instance_id,
+            database_id=google_database,
+            table_name=table_name,
+            id_column="row_id",
+            ignore_metadata_columns=[],
+            embedding_service=embeddings,
+            metadata_json_column="metadata",
+            query_parameters=QueryParameters(
+                distance_strategy=DistanceStrategy.COSINE,
+            ),
+        )
+
+        embedding = embeddings.embed_query(
+            "Testing the langchain integration with spanner"
+        )
+        docs = db.similarity_search_with_score_by_vector(embedding, k=3)
+        distances = [distance for _, distance in docs]
+
+        # A threshold between the second and the third distance keeps the first two.
+        distance_threshold = (distances[1] + distances[2]) / 2
+        filtered_docs = db.similarity_search_with_score_by_vector(
+            embedding, k=3, distance_threshold=distance_threshold
+        )
+
+        assert filtered_docs == docs[:2]
+
+    def test_spanner_vector_search_data5(self, client, setup_database):
+        loader, embeddings = setup_database
+        dot_product_table_name = "dot_product_" + table_name
+        index_name = "embedding_index_dot_product_" + table_name
+
+        SpannerVectorStore.init_vector_store_table(
+            instance_id=instance_id,
+            database_id=google_database,
+            table_name=dot_product_table_name,
+            id_column="row_id",
+            vector_size=3,
+            vector_search_index=VectorSearchIndex(
+                index_name=index_name,
+                num_leaves=10,
+                distance_strategy=DistanceStrategy.DOT_PRODUCT,
+            ),
+            distance_strategy=DistanceStrategy.DOT_PRODUCT,
+        )
+
+        try:
+            db = SpannerVectorStore(
+                instance_id=instance_id,
+                database_id=google_database,
+                table_name=dot_product_table_name,
+                id_column="row_id",
+                ignore_metadata_columns=[],
+                embedding_service=embeddings,
+                query_parameters=QueryParameters(
+                    distance_strategy=DistanceStrategy.DOT_PRODUCT,
+                ),
+            )
+            db.add_texts(
+                texts=["Langchain Test Text {}".format(i) for i in range(30)],
+            )
+
+            cosine_db = SpannerVectorStore(
+                instance_id=instance_id,
+                database_id=google_database,
+                table_name=dot_product_table_name,
+                id_column="row_id",
+                ignore_metadata_columns=[],
+                embedding_service=embeddings,
+                query_parameters=QueryParameters(
+                    distance_strategy=DistanceStrategy.COSINE,
+                ),
+            )
+            approximate_db = SpannerVectorStore(
+                instance_id=instance_id,
+                database_id=google_database,
+                table_name=dot_product_table_name,
+                id_column="row_id",
+                ignore_metadata_columns=[],
+                embedding_service=embeddings,
+                query_parameters=QueryParameters(
+                    algorithm=QueryParameters.NearestNeighborsAlgorithm.APPROXIMATE_NEAREST_NEIGHBOR,
+                    distance_strategy=DistanceStrategy.DOT_PRODUCT,
+                    vector_index_name=index_name,
+                    num_leaves_to_search=10,
+                ),
+            )
+
+            # FakeEmbeddings returns a new random vector per call, so the query is
+            # embedded once for all the stores.
+            embedding = embeddings.embed_query(
+                "Testing the langchain integration with spanner"
+            )
+            docs = db.similarity_search_with_score_by_vector(embedding, k=3)
+            cosine_docs = cosine_db.similarity_search_with_score_by_vector(
+                embedding, k=3
+            )
+            approximate_docs = approximate_db.similarity_search_with_score_by_vector(
+                embedding, k=3
+            )
+
+            assert len(docs) == 3
+            distances = [distance for _, distance in docs]
+            assert distances == sorted(distances)
+            assert all(0 <= distance <= 2 for distance in distances)
+
+            # On normalized embeddings 1 - DOT_PRODUCT is the cosine distance.
+            contents = [doc.page_content for doc, _ in docs]
+            assert contents == [doc.page_content for doc, _ in cosine_docs]
+            assert distances == pytest.approx(
+                [distance for _, distance in cosine_docs], abs=1e-4
+            )
+            assert contents == [doc.page_content for doc, _ in approximate_docs]
+        finally:
+            database = client.instance(instance_id).database(google_database)
+            operation = database.update_ddl(
+                [
+                    f"DROP VECTOR INDEX {index_name}",
+                    f"DROP TABLE IF EXISTS {dot_product_table_name}",
+                ]
+            )
+            operation.result(OPERATION_TIMEOUT_SECONDS)
+
+    def test_spanner_vector_dot_product_requires_normalized_table(self, setup_database):
+        loader, embeddings = setup_database
+
+        with pytest.raises(Exception):
+            SpannerVectorStore(
+                instance_id=instance_id,
+                database_id=google_database,
+                table_name=table_name,
+                id_column="row_id",
+                ignore_metadata_columns=[],
+                embedding_service=embeddings,
+                metadata_json_column="metadata",
+                query_parameters=QueryParameters(
+                    distance_strategy=DistanceStrategy.DOT_PRODUCT,
+                ),
+            )
+
+
+class TestSpannerVectorStoreApproximateGoogleSQL:
+    ann_table_name = "ann_" + table_name
+    index_name = "embedding_index_ann_" + table_name
+
+    @pytest.fixture(scope="class")
+    def setup_database(self, client):
+        SpannerVectorStore.init_vector_store_table(
+            instance_id=instance_id,
+            database_id=google_database,
+            table_name=self.ann_table_name,
+            id_column="row_id",
+            metadata_columns=[
+                TableColumn(name="title", type="STRING(MAX)", is_null=True),
+            ],
+            vector_size=3,
+            vector_search_index=VectorSearchIndex(
+                index_name=self.index_name,
+                num_leaves=10,
+            ),
+        )
+
+        embeddings = FakeEmbeddings(size=3)
+
+        db = SpannerVectorStore(
+            instance_id=instance_id,
+            database_id=google_database,
+            table_name=self.ann_table_name,
+            id_column="row_id",
+            ignore_metadata_columns=[],
+            embedding_service=embeddings,
+        )
+        db.add_texts(
+            texts=["Langchain Test Text {}".format(i) for i in range(30)],
+            metadatas=[{"title": "Title {}".format(i)} for i in range(30)],
+        )
+
+        yield embeddings
+
+        print("\nPerforming GSQL cleanup after each test...")
+
+        database = client.instance(instance_id).database(google_database)
+        operation = database.update_ddl(
+            [
+                f"DROP VECTOR INDEX {self.index_name}",
+                f"DROP TABLE IF EXISTS {self.ann_table_name}",
+            ]
+        )
+        operation.result(OPERATION_TIMEOUT_SECONDS)
+
+        print("\nGSQL Cleanup complete.")
+
+    def test_spanner_vector_search_approximate(self, setup_database):
+        embeddings = setup_database
+
+        exact_db = SpannerVectorStore(
+            instance_id=instance_id,
+            database_id=google_database,
+            table_name=self.ann_table_name,
+            id_column="row_id",
+            ignore_metadata_columns=[],
+            embedding_service=embeddings,
+        )
+        approximate_db = SpannerVectorStore(
+            instance_id=instance_id,
+            database_id=google_database,
+            table_name=self.ann_table_name,
+            id_column="row_id",
+            ignore_metadata_columns=[],
+            embedding_service=embeddings,
+            query_parameters=QueryParameters(
+                algorithm=QueryParameters.NearestNeighborsAlgorithm.APPROXIMATE_NEAREST_NEIGHBOR,
+                vector_index_name=self.index_name,
+                num_leaves_to_search=10,
+            ),
+        )
+
+        embedding = embeddings.embed_query(
+            "Testing the langchain integration with spanner"
+        )
+        exact_docs = exact_db.similarity_search_with_score_by_vector(embedding, k=3)
+        docs = approximate_db.similarity_search_with_score_by_vector(embedding, k=3)
+
+        # Searching all the leaves of the index finds the exact nearest neighbors.
+        assert [doc.page_content for doc, _ in docs] == [
+            doc.page_content for doc, _ in exact_docs
+        ]
+        distances = [distance for _, distance in docs]
+        assert distances == sorted(distances)
+
+    def test_spanner_vector_search_approximate_rerank(self, setup_database):
+        embeddings = setup_database
+
+        exact_db = SpannerVectorStore(
+            instance_id=instance_id,
+            database_id=google_database,
+            table_name=self.ann_table_name,
+            id_column="row_id",
+            ignore_metadata_columns=[],
+            embedding_service=embeddings,
+        )
+        approximate_db = SpannerVectorStore(
+            instance_id=instance_id,
+            database_id=google_database,
+            table_name=self.ann_table_name,
+            id_column="row_id",
+            ignore_metadata_columns=[],
+            embedding_service=embeddings,
+            query_parameters=QueryParameters(
+                algorithm=QueryParameters.NearestNeighborsAlgorithm.APPROXIMATE_NEAREST_NEIGHBOR,
+                vector_index_name=self.index_name,
+                num_leaves_to_search=2,
+                over_fetch=5,
+            ),
+        )
+
+        embedding = embeddings.embed_query(
+            "Testing the langchain integration with spanner"
+        )
+        exact_distances = {
+            doc.page_content: distance
+            for doc, distance in exact_db.similarity_search_with_score_by_vector(
+                embedding, k=30
+            )
+        }
+        docs = approximate_db.similarity_search_with_score_by_vector(embedding, k=3)
+
+        # The candidates are re-ranked by their exact distance on the client.
+        assert len(docs) == 3
+        distances = [distance for _, distance in docs]
+        assert distances == sorted(distances)
+        assert distances == pytest.approx(
+            [exact_distances[doc.page_content] for doc, _ in docs], abs=1e-4
+        )
+
+        # The threshold applies to the exact distances of the re-ranked candidates.
+        distance_threshold = (distances[1] + distances[2]) / 2
+        filtered_docs = approximate_db.similarity_search_with_score_by_vector(
+            embedding, k=3, distance_threshold=distance_threshold
+        )
+        assert [doc.page_content for doc, _ in filtered_docs] == [
+            doc.page_content for doc, _ in docs[:2]
+        ]
+
+        batch_docs = approximate_db.similarity_search_batch(
+            [
+                "Testing the langchain integration with spanner",
+                "Testing batched search with spanner",
+            ],
+            k=3,
+        )
+
+        assert len(batch_docs) == 2
+        assert all(len(query_docs) == 3 for query_docs in batch_docs)
+
 
 class TestSpannerVectorStorePGSQL:
     @pytest.fixture(scope="class")
@@ -485,6 +1032,40 @@ class TestSpannerVectorStorePGSQL:
 
         assert deleted == True
 
+    def test_spanner_vector_delete_data_by_ids(self, client, setup_database):
+        loader, embeddings = setup_database
+
+        db = SpannerVectorStore(
+            instance_id=instance_id,
+            database_id=pg_database,
+            table_name=table_name,
+            id_column="row_id",
+            ignore_metadata_columns=[],
+            embedding_service=embeddings,
+            metadata_json_column="metadata",
+        )
+
+        ids = db.add_texts(
+            texts=["Langchain Test Text 4", "Langchain Test Text 5"],
+            metadatas=[{"title": "Title 4"}, {"title": "Title 5"}],
+        )
+
+        deleted = db.delete(ids=ids)
+
+        assert deleted == True
+
+        database = client.instance(instance_id).database(pg_database)
+        with database.snapshot() as snapshot:
+            results = snapshot.execute_sql(
+                f"SELECT row_id FROM {table_name} WHERE row_id = ANY($1)",
+                params={"p1": ids},
+                param_types={"p1": param_types.Array(param_types.STRING)},
+            )
+            assert list(results) == []
+
+        # Deleting ids without matching rows succeeds the same way.
+        assert db.delete(ids=ids) == True
+
     def test_spanner_vector_search_data1(self, setup_database):
         loader, embeddings = setup_database
 
@@ -525,6 +1106,31 @@ class TestSpannerVectorStorePGSQL:
 
         assert len(docs) == 3
 
+    def test_spanner_vector_search_batch(self, setup_database):
+        loader, embeddings = setup_database
+
+        # The queries must embed to the same vectors in the batched and the single
+        # searches.
+        db = SpannerVectorStore(
+            instance_id=instance_id,
+            database_id=pg_database,
+            table_name=table_name,
+            id_column="row_id",
+            ignore_metadata_columns=[],
+            embedding_service=DeterministicFakeEmbedding(size=3),
+            metadata_json_column="metadata",
+        )
+
+        queries = [
+            "Testing the langchain integration with spanner",
+            "Testing batched search with spanner",
+        ]
+        docs = db.similarity_search_batch(queries, k=2)
+
+        assert len(docs) == 2
+        for query, query_docs in zip(queries, docs):
+            assert query_docs == db.similarity_search(query, k=2)
+
     def test_spanner_vector_search_data3(self, setup_database):
         loader, embeddings = setup_database
 
@@ -569,3 +1175,22 @@ class TestSpannerVectorStorePGSQL:
         )
 
         assert len(docs) == 3
+
+    def test_spanner_vector_search_approximate_not_supported(self, setup_database):
+        loader, embeddings = setup_database
+
+        with pytest.raises(ValueError):
+            SpannerVectorStore(
+                instance_id=instance_id,
+                database_id=pg_database,
+                table_name=table_name,
+                id_column="row_id",
+                ignore_metadata_columns=[],
+                embedding_service=embeddings,
+                metadata_json_column="metadata",
+                query_parameters=QueryParameters(
+                    algorithm=QueryParameters.NearestNeighborsAlgorithm.APPROXIMATE_NEAREST_NEIGHBOR,
+                    vector_index_name="embedding_index",
+                    num_leaves_to_search=10,
+                ),
+            )